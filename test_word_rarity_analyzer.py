@@ -1,14 +1,24 @@
 import unittest
-from word_rarity_analyzer import word_rarity, analyze_rarity
+from unittest import mock
+from word_rarity_analyzer import word_rarity, analyze_rarity, main
 import io
+from contextlib import redirect_stdout
+import os
+import subprocess
 import sys
-import importlib
+import tempfile
 from wordfreq import available_languages
 import time
 import random
 
 class TestWordRarityAnalyzer(unittest.TestCase):
 
+    @classmethod
+    def setUpClass(cls):
+        # Generate the largest performance corpus once; smaller sizes are prefixes of it
+        words = ['the', 'quick', 'brown', 'fox', 'jumps', 'over', 'lazy', 'dog']
+        cls.corpus = random.choices(words, k=10000)
+
     def test_word_rarity(self):
         # Test common English words
         self.assertLess(word_rarity('the'), 2)
@@ -97,6 +107,71 @@ class TestWordRarityAnalyzer(unittest.TestCase):
             self.assertEqual(len(results), 3)
             self.assertTrue(0 < avg_rarity < 8)
 
+    def test_analyze_rarity_ascii_tokenization(self):
+        # The ASCII fast path must agree with the Unicode tokenizer
+        text = "don't stop: word123 foo_bar tab\tsep, end."
+        results, _ = analyze_rarity(text)
+        ascii_words = {word for word, _ in results}
+        results, _ = analyze_rarity(text + " é")
+        unicode_words = {word for word, _ in results} - {'é'}
+        self.assertSetEqual(ascii_words, {'don', 't', 'stop', 'tab', 'sep', 'end'})
+        self.assertSetEqual(ascii_words, unicode_words)
+
+    def test_analyze_rarity_top_k(self):
+        text = "The quixotic physicist pondered the ephemeral nature of serendipity"
+        all_results, avg_rarity = analyze_rarity(text)
+        for top_k in (-1, 0, 3, len(all_results) + 5):
+            with self.subTest(top_k=top_k):
+                if top_k < 0:
+                    with self.assertRaises(ValueError):
+                        analyze_rarity(text, top_k=top_k)
+                    continue
+                results, top_avg = analyze_rarity(text, top_k=top_k)
+                self.assertEqual(results, all_results[:top_k])
+                self.assertEqual(top_avg, avg_rarity, "Average should cover all words")
+
+        for invalid in (2.5, True):
+            with self.subTest(top_k=invalid):
+                with self.assertRaises(ValueError):
+                    analyze_rarity(text, top_k=invalid)
+
+    def test_analyze_rarity_repeated_calls(self):
+        text = "The quick brown fox jumps over the lazy dog"
+        results, avg_rarity = analyze_rarity(text)
+        results.clear()
+
+        # Mutating a returned list must not affect later calls for the same text
+        repeated, repeated_avg = analyze_rarity(text)
+        self.assertEqual(len(repeated), 8)
+        self.assertEqual(repeated_avg, avg_rarity)
+
+        # Validation still applies to text that has been analyzed before
+        with self.assertRaises(ValueError):
+            analyze_rarity(text, max_length=10)
+
+    def test_analyze_rarity_case_insensitive(self):
+        results, _ = analyze_rarity("The the THE tHe")
+        self.assertEqual([word for word, _ in results], ['the'])
+
+    def test_analyze_rarity_tie_break(self):
+        # Unknown words all share the maximum rarity and fall back to alphabetical order
+        results, _ = analyze_rarity("zzxqv bbqzx qqzxv")
+        self.assertEqual(results, [('bbqzx', 8), ('qqzxv', 8), ('zzxqv', 8)])
+
+    def test_analyze_rarity_combining_marks(self):
+        # Devanagari words contain combining vowel signs and viramas
+        if 'hi' in available_languages():
+            results, _ = analyze_rarity("नमस्ते दुनिया", language='hi')
+            words = [word for word, _ in results]
+            self.assertSetEqual(set(words), {'नमस्ते', 'दुनिया'})
+
+    def test_analyze_rarity_join_controls(self):
+        # Persian uses a zero-width non-joiner (U+200C) inside words
+        if 'fa' in available_languages():
+            results, _ = analyze_rarity("من می\u200cخواهم کتاب\u200cها را بخوانم", language='fa')
+            words = [word for word, _ in results]
+            self.assertSetEqual(set(words), {'من', 'می\u200cخواهم', 'کتاب\u200cها', 'را', 'بخوانم'})
+
     def test_analyze_rarity_additional_checks(self):
         test_cases = [
             ("The quick brown fox jumps over the lazy dog", 8),
@@ -129,16 +204,7 @@ class TestWordRarityAnalyzer(unittest.TestCase):
                     self.assertSetEqual(set(expected_words), set(actual_words), f"Expected words {expected_words}, but got {actual_words}")
 
     def run_integration_test(self, test_input, expected_outputs, language="en"):
-        captured_output = io.StringIO()
-        sys.stdout = captured_output
-
-        try:
-            word_rarity_analyzer = importlib.import_module('word_rarity_analyzer')
-            word_rarity_analyzer.main(text=test_input, language=language)
-        finally:
-            sys.stdout = sys.__stdout__
-
-        output = captured_output.getvalue()
+        output = self.get_integration_output(test_input, language)
         for expected in expected_outputs:
             self.assertIn(expected, output)
 
@@ -208,16 +274,10 @@ class TestWordRarityAnalyzer(unittest.TestCase):
         avg_rarity = float(avg_rarity_line.split(': ')[-1])
         self.assertTrue(0 < avg_rarity < 8, f"Average rarity {avg_rarity} should be between 0 and 8")
 
-    def get_integration_output(self, test_input):
+    def get_integration_output(self, test_input, language="en"):
         captured_output = io.StringIO()
-        sys.stdout = captured_output
-
-        try:
-            word_rarity_analyzer = importlib.import_module('word_rarity_analyzer')
-            word_rarity_analyzer.main(text=test_input, language="en")
-        finally:
-            sys.stdout = sys.__stdout__
-
+        with redirect_stdout(captured_output):
+            main(text=test_input, language=language)
         return captured_output.getvalue()
 
     def test_invalid_language(self):
@@ -227,6 +287,15 @@ class TestWordRarityAnalyzer(unittest.TestCase):
         with self.assertRaises(ValueError):
             analyze_rarity('Hello world', 'invalid_language')
 
+    def test_word_rarity_caching(self):
+        # Repeated lookups should return identical scores
+        self.assertEqual(word_rarity('serendipity'), word_rarity('serendipity'))
+
+        # Errors must not be cached as results
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                word_rarity('hello', 'invalid_language')
+
     def test_extremely_long_input(self):
         very_long_text = "word " * 50001  # 250,005 characters
         with self.assertRaises(ValueError):
@@ -261,6 +330,14 @@ class TestWordRarityAnalyzer(unittest.TestCase):
         with self.assertRaises(ValueError):
             analyze_rarity("Hello world", 'unsupported_lang')
 
+        # Input without letters is still validated before returning early
+        with self.assertRaises(ValueError):
+            analyze_rarity("123 !@# 456", 'unsupported_lang')
+
+        # Compatibility characters that normalize to letters are still analyzed
+        results, _ = analyze_rarity("\u337f")  # SQUARE CORPORATION -> 株式会社
+        self.assertEqual(len(results), 1)
+
     def test_integration_error_handling(self):
         # Test with invalid language
         self.run_integration_test("Hello world", 
@@ -274,25 +351,77 @@ class TestWordRarityAnalyzer(unittest.TestCase):
 
     def test_user_interface(self):
         test_input = "This is a\nmulti-line\ninput test"
-        captured_output = io.StringIO()
-        sys.stdout = captured_output
-
-        try:
-            word_rarity_analyzer = importlib.import_module('word_rarity_analyzer')
-            word_rarity_analyzer.main(text=test_input, language="en")
-        finally:
-            sys.stdout = sys.__stdout__
-
-        output = captured_output.getvalue()
+        output = self.get_integration_output(test_input)
 
         # Verify results are displayed
         self.assertIn("Average Rarity Score:", output)
         self.assertIn("Word: multi |", output)
         self.assertIn("Word: line |", output)
 
+    def test_integration_top_k(self):
+        captured_output = io.StringIO()
+        with redirect_stdout(captured_output):
+            main(text="The quixotic physicist pondered the ephemeral nature of serendipity", top_k=2)
+
+        output = captured_output.getvalue()
+        self.assertIn("Top 2 Rarest Words:", output)
+        self.assertEqual(output.count("Word: "), 2)
+        self.assertNotIn("Word: the |", output)
+
+    def test_cli_rejects_non_positive_top(self):
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'word_rarity_analyzer.py')
+        for value in ('0', '-2', 'abc'):
+            with self.subTest(top=value):
+                result = subprocess.run([sys.executable, script, '--top', value],
+                                        input="Hello world\n\n", capture_output=True, text=True)
+                self.assertEqual(result.returncode, 2)
+                self.assertIn("argument --top", result.stderr)
+                self.assertNotIn("Rarest Words", result.stdout)
+
+    def test_file_input(self):
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', suffix='.txt', delete=False) as f:
+            f.write("Hello world " * 10)
+        self.addCleanup(os.remove, f.name)
+
+        captured_output = io.StringIO()
+        with redirect_stdout(captured_output):
+            main(file_path=f.name)
+        self.assertIn("Word: hello |", captured_output.getvalue())
+
+        # Files longer than max_length are rejected without reading them in full
+        captured_output = io.StringIO()
+        with redirect_stdout(captured_output):
+            main(file_path=f.name, max_length=50)
+        self.assertIn("Error: Input text is too long. Maximum allowed length is 50 characters.",
+                      captured_output.getvalue())
+
+    def test_interactive_input(self):
+        captured_output = io.StringIO()
+        with mock.patch('sys.stdin', io.StringIO("Hello world\nsecond line\n\nignored\n")), \
+                redirect_stdout(captured_output):
+            main()
+
+        output = captured_output.getvalue()
+        self.assertIn("Please paste your text below", output)
+        self.assertIn("Word: second |", output)
+        self.assertNotIn("Word: ignored |", output, "Input should stop at the first empty line")
+
+        # Pasted input beyond max_length is rejected without being accumulated in full
+        captured_output = io.StringIO()
+        with mock.patch('sys.stdin', io.StringIO(("word " * 20 + "\n") * 3 + "\n")), \
+                redirect_stdout(captured_output):
+            main(max_length=50)
+        self.assertIn("Error: Input text is too long. Maximum allowed length is 50 characters.",
+                      captured_output.getvalue())
+
+        # Input ending without a blank line is still analyzed
+        captured_output = io.StringIO()
+        with mock.patch('sys.stdin', io.StringIO("Hello world")), redirect_stdout(captured_output):
+            main()
+        self.assertIn("Word: hello |", captured_output.getvalue())
+
     def generate_text(self, word_count):
-        words = ['the', 'quick', 'brown', 'fox', 'jumps', 'over', 'lazy', 'dog']
-        return ' '.join(random.choice(words) for _ in range(word_count))
+        return ' '.join(self.corpus[:word_count])
 
     def test_performance(self):
         sizes = [100, 1000, 10000]
@@ -1,8 +1,42 @@
 from wordfreq import zipf_frequency, available_languages
-import re
+import regex
 import unicodedata
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 import argparse
+import heapq
+from collections import Counter
+from functools import lru_cache
+
+# Computed once; available_languages() rescans wordfreq's data files on every call
+_AVAILABLE_LANGUAGES = frozenset(available_languages())
+
+# Words start with a letter and may carry combining marks (e.g. Devanagari vowel signs)
+# and zero-width joiners/non-joiners (e.g. Persian ZWNJ), which regex counts as word characters
+_WORD_RE = regex.compile(r'\b\p{L}[\p{L}\p{M}\p{Join_Control}]*\b')
+_LETTER_RE = regex.compile(r'\p{L}')
+
+# Maps every ASCII character except letters, digits and '_' to a space
+_ASCII_SEPARATORS = str.maketrans({chr(c): ' ' for c in range(128) if not (chr(c).isalnum() or chr(c) == '_')})
+
+@lru_cache(maxsize=131072)
+def _word_rarity(word: str, language: str) -> float:
+    """
+    Calculate the rarity score of an NFKC-normalized word without validating the language.
+
+    Callers must check the language against _AVAILABLE_LANGUAGES first.
+    """
+    if len(word) > 50:
+        return 8  # Very long words are likely rare
+    
+    if word.isdigit():
+        return 8  # Maximum rarity for numbers
+    
+    zipf = zipf_frequency(word, language)
+    
+    # Convert Zipf frequency to rarity score (invert scale)
+    rarity_score = 8 - zipf
+    
+    return max(0, min(rarity_score, 8))
 
 def word_rarity(word: str, language: str = 'en') -> float:
     """
@@ -18,25 +52,53 @@ def word_rarity(word: str, language: str = 'en') -> float:
     Raises:
     ValueError: If the language is not supported.
     """
-    if language not in available_languages():
+    if language not in _AVAILABLE_LANGUAGES:
         raise ValueError(f"Unsupported language: {language}")
     
-    word = unicodedata.normalize('NFKC', word)
-    
-    if re.match(r'^\d+$', word):
-        return 8  # Maximum rarity for numbers
-    
-    if len(word) > 50:
-        return 8  # Very long words are likely rare
+    return _word_rarity(unicodedata.normalize('NFKC', word), language)
+
+def _tokenize(text: str) -> List[str]:
+    """
+    Split normalized, lowercased text into words.
+
+    ASCII text takes a str.translate/split fast path that yields the same words as _WORD_RE:
+    runs of word characters are kept only if they are purely alphabetic.
+    """
+    if text.isascii():
+        return [token for token in text.translate(_ASCII_SEPARATORS).split() if token.isalpha()]
+    return _WORD_RE.findall(text)
+
+@lru_cache(maxsize=64)
+def _analyze_text(text: str, language: str, top_k: Optional[int]) -> Tuple[Tuple[Tuple[str, float], ...], float]:
+    """
+    Cached core of analyze_rarity for already validated arguments.
+
+    Returns the sorted results as a tuple so the cached value is immutable.
+    """
+    text = unicodedata.normalize('NFKC', text)
     
-    zipf = zipf_frequency(word, language)
+    # Nothing to tokenize if there are no letters (checked after NFKC, which can produce letters)
+    if not _LETTER_RE.search(text):
+        return (), 0
     
-    # Convert Zipf frequency to rarity score (invert scale)
-    rarity_score = 8 - zipf
+    # Find all alphabetic words (including Unicode letters and marks)
+    words = _tokenize(text.lower())
+    # Count occurrences so each distinct word is only scored once
+    word_counts = Counter(words)
+    rarity = _word_rarity  # Local binding avoids a global lookup per word
+    word_rarity_dict = {word: rarity(word, language) for word in word_counts}
+
+    sort_key = lambda x: (-x[1], x[0])
+    if top_k is None:
+        sorted_results = sorted(word_rarity_dict.items(), key=sort_key)
+    else:
+        # Partial selection is O(n log k) instead of a full O(n log n) sort
+        sorted_results = heapq.nsmallest(top_k, word_rarity_dict.items(), key=sort_key)
+    avg_rarity = sum(word_rarity_dict.values()) / len(word_rarity_dict) if word_rarity_dict else 0
     
-    return max(0, min(rarity_score, 8))
+    return tuple(sorted_results), avg_rarity
 
-def analyze_rarity(text: str, language: str = 'en', max_length: int = 100000) -> Tuple[List[Tuple[str, float]], float]:
+def analyze_rarity(text: str, language: str = 'en', max_length: int = 100000, top_k: Optional[int] = None) -> Tuple[List[Tuple[str, float]], float]:
     """
     Analyze the rarity of words in a given text.
 
@@ -44,61 +106,95 @@ def analyze_rarity(text: str, language: str = 'en', max_length: int = 100000) ->
     text (str): The text to analyze.
     language (str): The language code (default: 'en' for English).
     max_length (int): Maximum allowed length of input text.
+    top_k (int, optional): Only return the top_k rarest words; must be >= 0 (default: all words).
 
     Returns:
     tuple: A tuple containing:
         - list of tuples: (word, rarity_score) sorted by rarity (highest to lowest).
-        - float: Average rarity score of all words.
+        - float: Average rarity score of all words, including those beyond top_k.
 
     Raises:
-    ValueError: If the language is not supported or text is too long.
+    ValueError: If the language is not supported, text is too long or top_k is invalid.
     """
-    if language not in available_languages():
+    if language not in _AVAILABLE_LANGUAGES:
         raise ValueError(f"Unsupported language: {language}")
     
     if len(text) > max_length:
         raise ValueError(f"Input text is too long. Maximum allowed length is {max_length} characters.")
     
-    text = unicodedata.normalize('NFKC', text)
+    if top_k is not None and (isinstance(top_k, bool) or not isinstance(top_k, int) or top_k < 0):
+        raise ValueError(f"Invalid top_k: {top_k!r}. Expected a non-negative integer.")
     
-    # Find all alphabetic words (including Unicode letters)
-    words = re.findall(r'\b[^\W\d_]+\b', text.lower(), re.UNICODE)
-    word_rarity_dict = {word: word_rarity(word, language) for word in set(words)}
+    sorted_results, avg_rarity = _analyze_text(text, language, top_k)
+    # Copy so callers can't mutate the cached results
+    return list(sorted_results), avg_rarity
 
-    sorted_results = sorted(word_rarity_dict.items(), key=lambda x: (-x[1], x[0]))
-    avg_rarity = sum(word_rarity_dict.values()) / len(word_rarity_dict) if word_rarity_dict else 0
-    
-    return sorted_results, avg_rarity
+def _read_interactive_input(max_length: int) -> str:
+    """
+    Read lines from stdin until an empty line or EOF.
+
+    Stops keeping lines once the joined text exceeds max_length, so pasted input never holds more
+    than one line past the limit in memory. Later lines are still read (and discarded) so they don't
+    leak into the shell after the program exits.
+    """
+    lines = []
+    length = -1  # Joining n lines adds n - 1 newlines
+    try:
+        for line in iter(input, ""):
+            if length <= max_length:
+                lines.append(line)
+                length += len(line) + 1
+    except EOFError:
+        pass
+    return "\n".join(lines)
+
+def _positive_int(value: str) -> int:
+    """
+    Parse a command-line value as an integer of at least 1.
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
 
-def main(file_path=None, language="en", text=None):
+def main(file_path=None, language="en", text=None, max_length=100000, top_k=None):
     """
     Main function to handle input and display results of word rarity analysis.
     """
     if file_path:
         with open(file_path, 'r', encoding='utf-8') as f:
-            text = f.read()
+            # One character past the limit is enough for analyze_rarity to reject the text
+            text = f.read(max_length + 1)
     elif text is None:
         print("Please paste your text below and press Enter twice when you're done:")
-        text = "\n".join(iter(input, ""))
+        text = _read_interactive_input(max_length)
 
     if not text.strip():
         print("Error: Empty input")
         return
 
     try:
-        results, avg_rarity = analyze_rarity(text, language)
+        results, avg_rarity = analyze_rarity(text, language, max_length, top_k)
     except ValueError as e:
         print(f"Error: {str(e)}")
         return
 
     print(f"\nAverage Rarity Score: {avg_rarity:.2f}")
-    print("\nAll Words Sorted by Rarity:")
-    for word, rarity in results:
-        print(f"Word: {word} | Rarity Score: {rarity:.2f}")
+    if top_k is None:
+        print("\nAll Words Sorted by Rarity:")
+    else:
+        print(f"\nTop {top_k} Rarest Words:")
+    if results:
+        # One write for all lines instead of a print call per word
+        print("\n".join(f"Word: {word} | Rarity Score: {rarity:.2f}" for word, rarity in results))
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Analyze word rarity in a given text.")
     parser.add_argument("--file", help="Path to a text file to analyze")
     parser.add_argument("--language", default="en", help="Language code (default: en)")
+    parser.add_argument("--top", type=_positive_int, help="Only show the N rarest words (default: all words)")
     args = parser.parse_args()
-    main(file_path=args.file, language=args.language)
\ No newline at end of file
+    main(file_path=args.file, language=args.language, top_k=args.top)
\ No newline at end of file